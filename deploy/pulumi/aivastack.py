@@ -0,0 +1,472 @@
+"""
+Shared AI Virtual Assistant topology for the production and Codespaces stacks
+Both Pulumi entry points register a single AIVAStack component
+"""
+
+from typing import Any, Dict, List, Literal, Optional
+
+import pulumi
+import pulumi_kubernetes as k8s
+import pulumi_random as random
+
+from factories import make_deployment, make_service, make_stateful_set
+
+Environment = Literal["prod", "codespaces"]
+
+NAMESPACES = {
+    "prod": "ai-virtual-assistant",
+    "codespaces": "ai-virtual-assistant-codespaces",
+}
+
+ENVIRONMENT_LABELS = {
+    "prod": "production",
+    "codespaces": "codespaces",
+}
+
+# Resources were registered at the stack root before this component existed
+ROOT_ALIASES = [pulumi.Alias(parent=pulumi.ROOT_STACK_RESOURCE)]
+
+
+class AIVAStack(pulumi.ComponentResource):
+    """Namespace, secrets, backing services, agent, analytics and ingress for one environment.
+
+    Args:
+        name: Logical name of the component
+        env: Target environment, either "prod" or "codespaces"
+        datarobot: DataRobot settings (api_token, endpoint, llm/embedding/rerank
+            deployment ids and an optional project_id)
+        infra: Infrastructure settings from the stack configuration
+        resources: Container resource requirements keyed by service name
+            ("postgres", "redis", "milvus", "agent", "analytics")
+        ingress_host: Public host name for the ingress, if any
+    """
+
+    def __init__(self,
+                 name: str,
+                 env: Environment,
+                 datarobot: Dict[str, Any],
+                 infra: Optional[Dict[str, Any]] = None,
+                 resources: Optional[Dict[str, Dict[str, Dict[str, str]]]] = None,
+                 ingress_host: Optional[str] = None,
+                 opts: Optional[pulumi.ResourceOptions] = None):
+        super().__init__("ai-virtual-assistant:index:AIVAStack", name, None, opts)
+
+        infra = infra or {}
+        resources = resources or {}
+        project_id = datarobot.get("project_id")
+
+        # When the HPA owns the agent replica count, Pulumi must not manage it too
+        hpa_enabled = infra.get("hpa_enabled", env == "prod")
+
+        # Generate random passwords for local services
+        passwords = self._passwords(["postgres", "redis"])
+        self.postgres_password = passwords["postgres"]
+        self.redis_password = passwords["redis"]
+
+        # Create namespace
+        namespace_name = NAMESPACES[env]
+        namespace_labels = {
+            "app": "ai-virtual-assistant",
+            "environment": ENVIRONMENT_LABELS[env]
+        }
+        if env == "codespaces":
+            namespace_labels["datarobot-project"] = project_id or "default"
+
+        self.namespace = k8s.core.v1.Namespace(namespace_name,
+            metadata=k8s.meta.v1.ObjectMetaArgs(
+                name=namespace_name,
+                labels=namespace_labels
+            ),
+            opts=pulumi.ResourceOptions(parent=self, aliases=ROOT_ALIASES)
+        )
+
+        # Namespaced resources reference the namespace by its literal name, so
+        # siblings only wait on the namespace itself and the engine can register
+        # them concurrently.
+        ns_opts = pulumi.ResourceOptions(
+            parent=self,
+            depends_on=[self.namespace],
+            aliases=ROOT_ALIASES
+        )
+
+        # Create DataRobot secrets. string_data takes plain values and lets the
+        # API server do the base64 encoding that data would expect from us.
+        secret_data = {
+            "api-token": datarobot["api_token"],
+            "llm-deployment-id": datarobot["llm_deployment_id"],
+            "embedding-deployment-id": datarobot["embedding_deployment_id"],
+            "rerank-deployment-id": datarobot["rerank_deployment_id"]
+        }
+        if env == "codespaces":
+            secret_data["endpoint"] = datarobot["endpoint"]
+            secret_data["project-id"] = project_id
+
+        datarobot_secrets = k8s.core.v1.Secret("datarobot-secrets",
+            metadata=k8s.meta.v1.ObjectMetaArgs(
+                name="datarobot-secrets",
+                namespace=namespace_name
+            ),
+            type="Opaque",
+            string_data={key: pulumi.Output.secret(value or "") for key, value in secret_data.items()},
+            opts=ns_opts
+        )
+
+        # Agent pods need the secrets and whichever backing services are deployed locally
+        agent_dependencies = [datarobot_secrets]
+        # host:port of each locally deployed backing service, for app pods to wait on
+        backing_endpoints = {}
+
+        # PostgreSQL (unless using a managed service)
+        if not infra.get("use_managed_postgres", False):
+            postgres_volume_mounts = None
+            postgres_claim_templates = None
+
+            # Production keeps the database on a persistent volume. The StatefulSet
+            # owns the claim, so a rolling restart terminates the old pod before
+            # the new one attaches the ReadWriteOnce volume.
+            if env == "prod":
+                # The claim Postgres used before it moved to a StatefulSet. Kept declared
+                # for one release so upgrading does not delete it along with the old
+                # data; retain_on_delete leaves it in the cluster once it is dropped
+                # here. See "Upgrading Postgres to a StatefulSet" in PULUMI_DEPLOYMENT.md.
+                k8s.core.v1.PersistentVolumeClaim("postgres-pvc",
+                    metadata=k8s.meta.v1.ObjectMetaArgs(
+                        name="postgres-pvc",
+                        namespace=namespace_name
+                    ),
+                    spec=k8s.core.v1.PersistentVolumeClaimSpecArgs(
+                        access_modes=["ReadWriteOnce"],
+                        resources=k8s.core.v1.ResourceRequirementsArgs(
+                            requests={"storage": infra.get("postgres_storage", "10Gi")}
+                        )
+                    ),
+                    opts=pulumi.ResourceOptions.merge(ns_opts, pulumi.ResourceOptions(
+                        retain_on_delete=True
+                    ))
+                )
+                postgres_volume_mounts = [k8s.core.v1.VolumeMountArgs(
+                    name="postgres-storage",
+                    mount_path="/var/lib/postgresql/data"
+                )]
+                postgres_claim_templates = [k8s.core.v1.PersistentVolumeClaimArgs(
+                    metadata=k8s.meta.v1.ObjectMetaArgs(
+                        name="postgres-storage"
+                    ),
+                    spec=k8s.core.v1.PersistentVolumeClaimSpecArgs(
+                        access_modes=["ReadWriteOnce"],
+                        # e.g. a Portworx class with io_profile: db for random-write latency
+                        storage_class_name=infra.get("postgres_storage_class"),
+                        resources=k8s.core.v1.ResourceRequirementsArgs(
+                            requests={"storage": infra.get("postgres_storage", "10Gi")}
+                        )
+                    )
+                )]
+
+            make_stateful_set("postgres", namespace_name, "postgres:15", [5432],
+                env=[
+                    k8s.core.v1.EnvVarArgs(name="POSTGRES_PASSWORD", value=self.postgres_password.result),
+                    k8s.core.v1.EnvVarArgs(name="POSTGRES_DB", value="postgres"),
+                    k8s.core.v1.EnvVarArgs(name="POSTGRES_USER", value="postgres")
+                ],
+                resources=resources.get("postgres"),
+                volume_claim_templates=postgres_claim_templates,
+                volume_mounts=postgres_volume_mounts,
+                readiness_probe=k8s.core.v1.ProbeArgs(
+                    tcp_socket=k8s.core.v1.TCPSocketActionArgs(port=5432),
+                    initial_delay_seconds=5,
+                    period_seconds=5
+                ),
+                liveness_probe=k8s.core.v1.ProbeArgs(
+                    tcp_socket=k8s.core.v1.TCPSocketActionArgs(port=5432),
+                    initial_delay_seconds=30,
+                    period_seconds=10
+                ),
+                opts=ns_opts
+            )
+            agent_dependencies.append(make_service("postgres", namespace_name, [5432], opts=ns_opts))
+            backing_endpoints["postgres"] = "postgres:5432"
+
+        # Redis (unless using a managed service)
+        if not infra.get("use_managed_redis", False):
+            make_deployment("redis", namespace_name, "redis:7-alpine", [6379],
+                env=[k8s.core.v1.EnvVarArgs(name="REDIS_PASSWORD", value=self.redis_password.result)],
+                resources=resources.get("redis"),
+                replicas=1,
+                command=["redis-server", "--requirepass", self.redis_password.result],
+                # Keep the append-only file and snapshots on tmpfs rather than the
+                # container's overlay layer; the cache is rebuilt after a restart
+                volume_mounts=[k8s.core.v1.VolumeMountArgs(name="redis-data", mount_path="/data")],
+                readiness_probe=k8s.core.v1.ProbeArgs(
+                    exec_=k8s.core.v1.ExecActionArgs(
+                        command=["sh", "-c", "redis-cli -a \"$REDIS_PASSWORD\" --no-auth-warning ping"]
+                    ),
+                    initial_delay_seconds=5,
+                    period_seconds=5
+                ),
+                liveness_probe=k8s.core.v1.ProbeArgs(
+                    tcp_socket=k8s.core.v1.TCPSocketActionArgs(port=6379),
+                    initial_delay_seconds=15,
+                    period_seconds=10
+                ),
+                pod_spec={"volumes": [k8s.core.v1.VolumeArgs(
+                    name="redis-data",
+                    empty_dir=k8s.core.v1.EmptyDirVolumeSourceArgs(
+                        medium="Memory",
+                        size_limit=infra.get("redis_data_size_limit", "512Mi")
+                    )
+                )]},
+                opts=ns_opts
+            )
+            agent_dependencies.append(make_service("redis", namespace_name, [6379], opts=ns_opts))
+            backing_endpoints["redis"] = "redis:6379"
+
+        # Milvus (simplified, always deployed locally)
+        milvus_health = k8s.core.v1.HTTPGetActionArgs(path="/healthz", port=9091)
+        make_deployment("milvus", namespace_name, "milvusdb/milvus:v2.3.3", [19530, 9091],
+            env=[
+                k8s.core.v1.EnvVarArgs(name="ETCD_ENDPOINTS", value="etcd:2379"),
+                k8s.core.v1.EnvVarArgs(name="MINIO_ADDRESS", value="minio:9010")
+            ],
+            resources=resources.get("milvus"),
+            replicas=1,
+            # Milvus initialises slowly; the startup probe holds off the others
+            startup_probe=k8s.core.v1.ProbeArgs(http_get=milvus_health, period_seconds=10, failure_threshold=30),
+            readiness_probe=k8s.core.v1.ProbeArgs(http_get=milvus_health, period_seconds=10),
+            liveness_probe=k8s.core.v1.ProbeArgs(http_get=milvus_health, period_seconds=30),
+            opts=ns_opts
+        )
+        # Headless: DNS resolves straight to the ready Milvus pods, so gRPC
+        # connections skip the kube-proxy hop on the vector search path
+        make_service("milvus", namespace_name, [19530, 9091],
+            cluster_ip="None",
+            publish_not_ready_addresses=False,
+            opts=ns_opts
+        )
+
+        # Environment shared by the agent and analytics services. Only the secret
+        # keys the services read are projected, each under its own variable.
+        service_env = [
+            k8s.core.v1.EnvVarArgs(name="APP_LLM_MODELENGINE", value="datarobot"),
+            k8s.core.v1.EnvVarArgs(name="DATAROBOT_ENDPOINT", value=datarobot["endpoint"]),
+            k8s.core.v1.EnvVarArgs(name="APP_CACHE_URL", value="redis:6379"),
+            k8s.core.v1.EnvVarArgs(name="APP_DATABASE_URL", value="postgres:5432"),
+            k8s.core.v1.EnvVarArgs(name="POSTGRES_PASSWORD", value=self.postgres_password.result),
+            k8s.core.v1.EnvVarArgs(name="REDIS_PASSWORD", value=self.redis_password.result)
+        ] + _secret_env(datarobot_secrets, {
+            "DATAROBOT_API_TOKEN": "api-token",
+            "DATAROBOT_LLM_DEPLOYMENT_ID": "llm-deployment-id",
+            "DATAROBOT_EMBEDDING_DEPLOYMENT_ID": "embedding-deployment-id",
+            "DATAROBOT_RERANK_DEPLOYMENT_ID": "rerank-deployment-id"
+        })
+        if env == "codespaces":
+            service_env.append(k8s.core.v1.EnvVarArgs(name="ENVIRONMENT", value="codespaces"))
+
+        # Agent services
+        agent_env = list(service_env)
+        if env == "codespaces":
+            agent_env.append(k8s.core.v1.EnvVarArgs(name="DATAROBOT_PROJECT_ID", value=project_id or ""))
+
+        agent_deployment = make_deployment("agent-services", namespace_name,
+            "ai-virtual-assistant/agent:latest", [8000],
+            env=agent_env,
+            resources=resources.get("agent"),
+            replicas=None if hpa_enabled else infra.get("agent_replicas", 2 if env == "prod" else 1),
+            pod_annotations={
+                "prometheus.io/scrape": "true",
+                "prometheus.io/port": "8000",
+                "prometheus.io/path": "/metrics"
+            },
+            pod_spec={
+                "topology_spread_constraints": _spread_across_nodes("agent-services"),
+                # Conversation history and checkpoints live in Postgres, sessions in Redis
+                "init_containers": _wait_for(backing_endpoints, ["postgres", "redis"])
+            },
+            # Only the agent has a real ordering constraint on its backing services
+            opts=pulumi.ResourceOptions.merge(ns_opts, pulumi.ResourceOptions(
+                depends_on=agent_dependencies,
+                ignore_changes=["spec.replicas"] if hpa_enabled else None
+            ))
+        )
+
+        agent_service = make_service("agent-services", namespace_name, [8000], opts=ns_opts)
+        self.agent_service_url = _service_url(agent_service, namespace_name, 8000)
+
+        # Analytics services (Codespaces only)
+        self.analytics_service_url = None
+        if env == "codespaces":
+            make_deployment("analytics-services", namespace_name,
+                "ai-virtual-assistant/analytics:latest", [8001],
+                env=service_env,
+                resources=resources.get("analytics"),
+                replicas=infra.get("analytics_replicas", 1),
+                pod_spec={
+                    "topology_spread_constraints": _spread_across_nodes("analytics-services"),
+                    # Analytics only reads conversation history from Postgres
+                    "init_containers": _wait_for(backing_endpoints, ["postgres"])
+                },
+                opts=ns_opts
+            )
+
+            analytics_service = make_service("analytics-services", namespace_name, [8001], opts=ns_opts)
+            self.analytics_service_url = _service_url(analytics_service, namespace_name, 8001)
+
+        # Ingress for external access
+        if env == "prod":
+            ingress_annotations = {
+                "kubernetes.io/ingress.class": "nginx",
+                "cert-manager.io/cluster-issuer": "letsencrypt-prod"
+            }
+        else:
+            ingress_annotations = {
+                "kubernetes.io/ingress.class": "datarobot-ingress",
+                "datarobot.com/project-id": project_id or "default",
+                "datarobot.com/environment": "codespaces"
+            }
+
+        k8s.networking.v1.Ingress("ai-virtual-assistant-ingress",
+            metadata=k8s.meta.v1.ObjectMetaArgs(
+                name="ai-virtual-assistant-ingress",
+                namespace=namespace_name,
+                annotations=ingress_annotations
+            ),
+            spec=k8s.networking.v1.IngressSpecArgs(
+                tls=[k8s.networking.v1.IngressTLSArgs(
+                    hosts=[ingress_host],
+                    secret_name="ai-virtual-assistant-tls"
+                )] if ingress_host else None,
+                rules=[k8s.networking.v1.IngressRuleArgs(
+                    host=ingress_host,
+                    http=k8s.networking.v1.HTTPIngressRuleValueArgs(
+                        paths=[
+                            k8s.networking.v1.HTTPIngressPathArgs(
+                                path="/",
+                                path_type="Prefix",
+                                backend=k8s.networking.v1.IngressBackendArgs(
+                                    service=k8s.networking.v1.IngressServiceBackendArgs(
+                                        name=agent_service.metadata.name,
+                                        port=k8s.networking.v1.ServiceBackendPortArgs(number=8000)
+                                    )
+                                )
+                            )
+                        ]
+                    )
+                )]
+            ),
+            opts=ns_opts
+        )
+
+        # Horizontal Pod Autoscaler for agent services
+        if hpa_enabled:
+            k8s.autoscaling.v2.HorizontalPodAutoscaler("agent-hpa",
+                metadata=k8s.meta.v1.ObjectMetaArgs(
+                    name="agent-hpa",
+                    namespace=namespace_name
+                ),
+                spec=k8s.autoscaling.v2.HorizontalPodAutoscalerSpecArgs(
+                    scale_target_ref=k8s.autoscaling.v2.CrossVersionObjectReferenceArgs(
+                        api_version="apps/v1",
+                        kind="Deployment",
+                        name=agent_deployment.metadata.name
+                    ),
+                    min_replicas=2,
+                    max_replicas=10,
+                    metrics=[
+                        # Primary signal: in-flight requests per pod, exposed by the agent on
+                        # /metrics and served to the HPA through prometheus-adapter. LLM calls
+                        # are I/O bound, so queue depth rises well before CPU does.
+                        k8s.autoscaling.v2.MetricSpecArgs(
+                            type="Pods",
+                            pods=k8s.autoscaling.v2.PodsMetricSourceArgs(
+                                metric=k8s.autoscaling.v2.MetricIdentifierArgs(
+                                    name="agent_inflight_requests"
+                                ),
+                                target=k8s.autoscaling.v2.MetricTargetArgs(
+                                    type="AverageValue",
+                                    average_value=str(infra.get("hpa_inflight_requests_target", 4))
+                                )
+                            )
+                        ),
+                        # Secondary safety net on CPU
+                        k8s.autoscaling.v2.MetricSpecArgs(
+                            type="Resource",
+                            resource=k8s.autoscaling.v2.ResourceMetricSourceArgs(
+                                name="cpu",
+                                target=k8s.autoscaling.v2.MetricTargetArgs(
+                                    type="Utilization",
+                                    average_utilization=70
+                                )
+                            )
+                        )
+                    ]
+                ),
+                opts=ns_opts
+            )
+
+        self.namespace_name = self.namespace.metadata.name
+        self.register_outputs({
+            "namespace": self.namespace_name,
+            "agent_service_url": self.agent_service_url,
+            "analytics_service_url": self.analytics_service_url,
+        })
+
+    def _passwords(self, names: List[str]) -> Dict[str, random.RandomPassword]:
+        """Create one random password per name under a shared parent.
+
+        Siblings with no dependencies between them are dispatched to the random
+        provider concurrently instead of one after the other.
+        """
+        opts = pulumi.ResourceOptions(parent=self, aliases=ROOT_ALIASES)
+        return {
+            name: random.RandomPassword(f"{name}-password", length=16, special=True, opts=opts)
+            for name in names
+        }
+
+
+def _spread_across_nodes(app: str) -> List[k8s.core.v1.TopologySpreadConstraintArgs]:
+    """Prefer spreading an app's replicas evenly over nodes without blocking scheduling."""
+    return [k8s.core.v1.TopologySpreadConstraintArgs(
+        max_skew=1,
+        topology_key="kubernetes.io/hostname",
+        when_unsatisfiable="ScheduleAnyway",
+        label_selector=k8s.meta.v1.LabelSelectorArgs(
+            match_labels={"app": app}
+        )
+    )]
+
+
+def _secret_env(secret: k8s.core.v1.Secret, keys: Dict[str, str]) -> List[k8s.core.v1.EnvVarArgs]:
+    """Environment variables read from individual secret keys, given as {variable: key}."""
+    return [k8s.core.v1.EnvVarArgs(
+        name=variable,
+        value_from=k8s.core.v1.EnvVarSourceArgs(
+            secret_key_ref=k8s.core.v1.SecretKeySelectorArgs(
+                name=secret.metadata.name,
+                key=key
+            )
+        )
+    ) for variable, key in keys.items()]
+
+
+def _wait_for(backing_endpoints: Dict[str, str],
+              services: List[str]) -> Optional[List[k8s.core.v1.ContainerArgs]]:
+    """Init container that blocks until the named services that are deployed
+    locally accept TCP connections; None when none of them are.
+
+    Without it the app container crash-loops on connect and picks up the
+    kubelet's exponential restart backoff while the backing services start.
+    """
+    endpoints = [backing_endpoints[service] for service in services if service in backing_endpoints]
+    if not endpoints:
+        return None
+    return [k8s.core.v1.ContainerArgs(
+        name="wait-for-backing-services",
+        image="ghcr.io/patrickdappollonio/wait-for:latest",
+        args=[f"--host={endpoint}" for endpoint in endpoints] + ["--timeout=300s"]
+    )]
+
+
+def _service_url(service: k8s.core.v1.Service, namespace_name: str, port: int) -> pulumi.Output[str]:
+    """Cluster-local URL of a service."""
+    return pulumi.Output.concat(
+        "http://", service.metadata.name, ".", namespace_name, ".svc.cluster.local:", str(port)
+    )
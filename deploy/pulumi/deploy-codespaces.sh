@@ -15,6 +15,9 @@ YELLOW='\033[1;33m'
 BLUE='\033[0;34m'
 NC='\033[0m' # No Color
 
+# Maximum number of resource operations Pulumi runs concurrently
+PULUMI_PARALLEL=${PULUMI_PARALLEL:-256}
+
 # Check if we're in DataRobot Codespaces
 check_codespaces_environment() {
     echo -e "${BLUE}Checking DataRobot Codespaces environment...${NC}"
@@ -167,14 +170,18 @@ deploy_infrastructure() {
     pulumi config set infrastructure:analytics_replicas "1"
     pulumi config set infrastructure:retriever_replicas "1"
     
+    # Catch program errors before any provider call is made
+    echo -e "${YELLOW}Checking Pulumi program...${NC}"
+    python check_program.py
+
     # Preview the deployment
     echo -e "${YELLOW}Previewing deployment...${NC}"
-    pulumi preview
+    pulumi preview --parallel "$PULUMI_PARALLEL"
     
     read -p "Do you want to proceed with the deployment? (y/N): " CONFIRM
     if [[ $CONFIRM =~ ^[Yy]$ ]]; then
         echo -e "${YELLOW}Deploying infrastructure...${NC}"
-        pulumi up --yes
+        pulumi up --yes --parallel "$PULUMI_PARALLEL"
         
         echo -e "${GREEN}✅ Deployment complete!${NC}"
         
@@ -15,6 +15,9 @@ YELLOW='\033[1;33m'
 BLUE='\033[0;34m'
 NC='\033[0m' # No Color
 
+# Maximum number of resource operations Pulumi runs concurrently
+PULUMI_PARALLEL=${PULUMI_PARALLEL:-256}
+
 # Check if Pulumi is installed
 check_pulumi() {
     echo -e "${BLUE}Checking Pulumi installation...${NC}"
@@ -93,14 +96,24 @@ deploy_infrastructure() {
     # Select the stack
     pulumi stack select "$STACK_NAME"
     
+    # Catch program errors before any provider call is made
+    echo -e "${YELLOW}Checking Pulumi program...${NC}"
+    python check_program.py
+
+    # Postgres moved from a Deployment to a StatefulSet that starts on a new volume
+    if kubectl get deployment postgres -n ai-virtual-assistant &> /dev/null; then
+        echo -e "${YELLOW}⚠️  This update moves Postgres to a StatefulSet with a new, empty volume.${NC}"
+        echo -e "${YELLOW}   Dump the database first: see 'Upgrading Postgres to a StatefulSet' in docs/PULUMI_DEPLOYMENT.md${NC}"
+    fi
+
     # Preview the deployment
     echo -e "${YELLOW}Previewing deployment...${NC}"
-    pulumi preview
+    pulumi preview --parallel "$PULUMI_PARALLEL"
     
     read -p "Do you want to proceed with the deployment? (y/N): " CONFIRM
     if [[ $CONFIRM =~ ^[Yy]$ ]]; then
         echo -e "${YELLOW}Deploying infrastructure...${NC}"
-        pulumi up --yes
+        pulumi up --yes --parallel "$PULUMI_PARALLEL"
         
         echo -e "${GREEN}✅ Deployment complete!${NC}"
         
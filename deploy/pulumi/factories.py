@@ -0,0 +1,141 @@
+"""
+Builders for the Kubernetes resources shared by the AI Virtual Assistant stacks
+Every workload is labelled and selected by app=<name>
+"""
+
+from typing import Any, Dict, List, Optional
+
+import pulumi
+import pulumi_kubernetes as k8s
+
+ResourceSpec = Dict[str, Dict[str, str]]
+
+
+def make_service(name: str,
+                 namespace: str,
+                 ports: List[int],
+                 opts: Optional[pulumi.ResourceOptions] = None,
+                 **spec_args: Any) -> k8s.core.v1.Service:
+    """ClusterIP service exposing the given ports of the pods labelled app=<name>."""
+    return k8s.core.v1.Service(name,
+        metadata=k8s.meta.v1.ObjectMetaArgs(
+            name=name,
+            namespace=namespace
+        ),
+        spec=k8s.core.v1.ServiceSpecArgs(
+            selector={"app": name},
+            ports=[k8s.core.v1.ServicePortArgs(port=port, target_port=port) for port in ports],
+            **{"type": "ClusterIP", **spec_args}
+        ),
+        opts=opts
+    )
+
+
+def make_deployment(name: str,
+                    namespace: str,
+                    image: str,
+                    ports: List[int],
+                    env: Optional[List[k8s.core.v1.EnvVarArgs]] = None,
+                    resources: Optional[ResourceSpec] = None,
+                    replicas: Optional[int] = None,
+                    pod_annotations: Optional[Dict[str, str]] = None,
+                    pod_spec: Optional[Dict[str, Any]] = None,
+                    opts: Optional[pulumi.ResourceOptions] = None,
+                    **container_args: Any) -> k8s.apps.v1.Deployment:
+    """Single-container Deployment.
+
+    Extra keyword arguments go to the container; pod_spec holds extra PodSpecArgs.
+    """
+    return k8s.apps.v1.Deployment(name,
+        metadata=k8s.meta.v1.ObjectMetaArgs(
+            name=name,
+            namespace=namespace,
+            labels={"app": name}
+        ),
+        spec=k8s.apps.v1.DeploymentSpecArgs(
+            replicas=replicas,
+            selector=k8s.meta.v1.LabelSelectorArgs(
+                match_labels={"app": name}
+            ),
+            template=make_pod_template(name, image, ports, env, resources,
+                                       pod_annotations, pod_spec, **container_args)
+        ),
+        opts=opts
+    )
+
+
+def make_stateful_set(name: str,
+                      namespace: str,
+                      image: str,
+                      ports: List[int],
+                      env: Optional[List[k8s.core.v1.EnvVarArgs]] = None,
+                      resources: Optional[ResourceSpec] = None,
+                      volume_claim_templates: Optional[List[k8s.core.v1.PersistentVolumeClaimArgs]] = None,
+                      pod_spec: Optional[Dict[str, Any]] = None,
+                      opts: Optional[pulumi.ResourceOptions] = None,
+                      **container_args: Any) -> k8s.apps.v1.StatefulSet:
+    """Single-replica, single-container StatefulSet governed by the service of the same name.
+
+    Claims created from volume_claim_templates are kept when the StatefulSet is
+    deleted or replaced, and the replacement pod re-binds them by name.
+    """
+    return k8s.apps.v1.StatefulSet(name,
+        metadata=k8s.meta.v1.ObjectMetaArgs(
+            name=name,
+            namespace=namespace,
+            labels={"app": name}
+        ),
+        spec=k8s.apps.v1.StatefulSetSpecArgs(
+            service_name=name,
+            replicas=1,
+            selector=k8s.meta.v1.LabelSelectorArgs(
+                match_labels={"app": name}
+            ),
+            template=make_pod_template(name, image, ports, env, resources,
+                                       pod_spec=pod_spec, **container_args),
+            volume_claim_templates=volume_claim_templates,
+            persistent_volume_claim_retention_policy=k8s.apps.v1.StatefulSetPersistentVolumeClaimRetentionPolicyArgs(
+                when_deleted="Retain",
+                when_scaled="Retain"
+            ) if volume_claim_templates else None
+        ),
+        opts=opts
+    )
+
+
+def make_pod_template(name: str,
+                      image: str,
+                      ports: List[int],
+                      env: Optional[List[k8s.core.v1.EnvVarArgs]] = None,
+                      resources: Optional[ResourceSpec] = None,
+                      pod_annotations: Optional[Dict[str, str]] = None,
+                      pod_spec: Optional[Dict[str, Any]] = None,
+                      **container_args: Any) -> k8s.core.v1.PodTemplateSpecArgs:
+    """Pod template running one container named after the app."""
+    return k8s.core.v1.PodTemplateSpecArgs(
+        metadata=k8s.meta.v1.ObjectMetaArgs(
+            labels={"app": name},
+            annotations=pod_annotations
+        ),
+        spec=k8s.core.v1.PodSpecArgs(
+            containers=[k8s.core.v1.ContainerArgs(
+                name=name,
+                image=image,
+                ports=[k8s.core.v1.ContainerPortArgs(container_port=port) for port in ports],
+                env=env,
+                resources=resource_requirements(resources),
+                **container_args
+            )],
+            **(pod_spec or {})
+        )
+    )
+
+
+def resource_requirements(spec: Optional[ResourceSpec]) -> Optional[k8s.core.v1.ResourceRequirementsArgs]:
+    """Build container resource requirements from a {"requests": ..., "limits": ...} dict."""
+    if not spec:
+        return None
+    return k8s.core.v1.ResourceRequirementsArgs(
+        requests=spec.get("requests"),
+        limits=spec.get("limits")
+    )
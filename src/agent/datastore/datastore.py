@@ -17,13 +17,41 @@
 Baes class to store the user conversation in database permanently
 """
 
+import queue
+import threading
+from collections import Counter
+import time
 from typing import List, Optional
 from datetime import datetime
 
+from cachetools import TTLCache
+
 from src.common.utils import get_config
 from src.agent.datastore.postgres_client import PostgresClient
 # from src.agent.datastore.redis_client import RedisClient
 
+# Buffered conversation writes are flushed once this many are queued, or after
+# FLUSH_INTERVAL seconds, whichever comes first
+BATCH_SIZE = 500
+FLUSH_INTERVAL = 0.2
+MAX_PENDING_WRITES = 10_000
+
+# Sessions known to exist are remembered for this long without asking the database
+SESSION_CACHE_SIZE = 10_000
+SESSION_CACHE_TTL = 300
+
+_datastore: Optional["Datastore"] = None
+_datastore_lock = threading.Lock()
+
+
+def get_datastore() -> "Datastore":
+    """Return the process-wide datastore, creating it on first use"""
+    global _datastore
+    with _datastore_lock:
+        if _datastore is None:
+            _datastore = Datastore()
+        return _datastore
+
 
 class Datastore:
     def __init__(self):
@@ -40,21 +68,108 @@ class Datastore:
         else:
             raise ValueError(f"{db_name} database in not supported. Supported types: postgres, none")
 
-    def store_conversation(self, session_id: str, user_id: Optional[str], conversation_history: list, last_conversation_time: str, start_conversation_time: str):
-        """store conversation for given details"""
-        self.database.store_conversation(session_id, user_id, conversation_history, last_conversation_time, start_conversation_time)
+        self._known_sessions = TTLCache(maxsize=SESSION_CACHE_SIZE, ttl=SESSION_CACHE_TTL)
+        self._known_sessions_lock = threading.Lock()
+
+        # Conversation writes are queued and written in batches off the request path
+        self._pending = queue.Queue(maxsize=MAX_PENDING_WRITES)
+        # Queued writes per session, so reads and deletes wait only for their own session
+        self._queued_sessions = Counter()
+        self._queued_sessions_changed = threading.Condition()
+        self._writer = threading.Thread(target=self._flush_pending, name="datastore-writer", daemon=True)
+        self._writer.start()
+
+    def store_conversation(self, session_id: str, user_id: Optional[str], conversation_history: list, last_conversation_time: str, start_conversation_time: str, sync: bool = False):
+        """store conversation for given details, in the background unless sync is set"""
+        row = (session_id, user_id, conversation_history, last_conversation_time, start_conversation_time)
+        if not sync:
+            with self._queued_sessions_changed:
+                self._queued_sessions[session_id] += 1
+            try:
+                self._pending.put_nowait(row)
+                return
+            except queue.Full:
+                self._mark_written([row])
+                print("Conversation write queue is full, storing synchronously")
+        # Older queued writes for this session would otherwise land afterwards and replace this one
+        self.flush(session_id)
+        self.database.store_conversation(*row)
+        self._remember_session(session_id)
+
+    def store_conversations_bulk(self, rows: List[tuple]):
+        """store many (session_id, user_id, conversation_history, last_conversation_time, start_conversation_time) rows at once"""
+        self.database.store_conversations_bulk(rows)
+        # Sessions are only cached as existing once their write has succeeded
+        for row in rows:
+            self._remember_session(row[0])
+
+    def flush(self, session_id: Optional[str] = None):
+        """block until queued conversations have been written, only those of session_id if given"""
+        if session_id is None:
+            self._pending.join()
+            return
+        with self._queued_sessions_changed:
+            self._queued_sessions_changed.wait_for(lambda: not self._queued_sessions[session_id])
 
     def fetch_conversation(self, session_id: str):
         """fetch conversation for given session id"""
+        self.flush(session_id)
         self.database.fetch_conversation(session_id)
 
     def delete_conversation(self, session_id: str):
         """delete conversation for given session id"""
+        # A queued write must not land after the delete and bring the session back
+        self.flush(session_id)
+        with self._known_sessions_lock:
+            self._known_sessions.pop(session_id, None)
         self.database.delete_conversation(session_id)
 
     def is_session(self, session_id: str) -> bool:
         """check if session exists"""
-        return self.database.is_session(session_id)
+        with self._known_sessions_lock:
+            if session_id in self._known_sessions:
+                return True
+        if self.database.is_session(session_id):
+            self._remember_session(session_id)
+            return True
+        return False
+
+    def _remember_session(self, session_id: str):
+        """cache that a session exists; only positive answers are cached"""
+        with self._known_sessions_lock:
+            self._known_sessions[session_id] = True
+
+    def _flush_pending(self):
+        """writer thread: collect queued conversations into batches and store them"""
+        while True:
+            batch = [self._pending.get()]
+            deadline = time.monotonic() + FLUSH_INTERVAL
+            while len(batch) < BATCH_SIZE:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._pending.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            try:
+                self.store_conversations_bulk(batch)
+            except Exception as e:
+                print(f"Error storing conversation batch: {e}")
+            finally:
+                self._mark_written(batch)
+                for _ in batch:
+                    self._pending.task_done()
+
+    def _mark_written(self, rows: List[tuple]):
+        """drop rows from the per-session queued counts and wake waiting flushes"""
+        with self._queued_sessions_changed:
+            for row in rows:
+                self._queued_sessions[row[0]] -= 1
+                if self._queued_sessions[row[0]] <= 0:
+                    del self._queued_sessions[row[0]]
+            self._queued_sessions_changed.notify_all()
 
 
 class MockDatabaseClient:
@@ -74,6 +189,11 @@ class MockDatabaseClient:
         }
         print(f"Mock: Stored conversation for session {session_id}")
     
+    def store_conversations_bulk(self, rows: List[tuple]):
+        """Mock store many conversations"""
+        for row in rows:
+            self.store_conversation(*row)
+
     def fetch_conversation(self, session_id: str):
         """Mock fetch conversation"""
         return self.conversations.get(session_id, None)
@@ -18,8 +18,9 @@ Manager conversation history return relavant conversation history
 based on session_id using postgres database
 """
 
-from typing import Optional
+from typing import List, Optional
 from sqlalchemy import create_engine, Column, String, DateTime, JSON
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from datetime import datetime
@@ -32,13 +33,25 @@ from src.common.utils import get_config
 db_user = os.environ.get("POSTGRES_USER")
 db_password = os.environ.get("POSTGRES_PASSWORD")
 db_name = os.environ.get("POSTGRES_DB")
+pool_min_size = int(os.environ.get("POSTGRES_POOL_MIN_SIZE", 4))
+pool_max_size = int(os.environ.get("POSTGRES_POOL_MAX_SIZE", 32))
 
 settings = get_config()
 # Postgres connection URL
 DATABASE_URL = f"postgresql://{db_user}:{db_password}@{settings.database.url}/{db_name}?sslmode=disable"
 
 Base = declarative_base()
-engine = create_engine(DATABASE_URL)
+# Connections are pooled and reused across calls; pre_ping replaces connections
+# the server closed while they sat idle. Every connection is kept on return
+# (overflow connections would be closed instead), and QueuePool only opens them
+# as needed, so pool_min_size is applied by prewarming.
+engine = create_engine(
+    DATABASE_URL,
+    pool_size=max(pool_max_size, pool_min_size),
+    max_overflow=0,
+    pool_pre_ping=True,
+    pool_recycle=1800
+)
 Session = sessionmaker(bind=engine)
 
 class ConversationHistory(Base):
@@ -54,6 +67,19 @@ class PostgresClient:
     def __init__(self):
         self.engine = engine
         Base.metadata.create_all(self.engine)
+        self._prewarm_pool()
+
+    def _prewarm_pool(self):
+        """Open the pool's steady-state connections up front so early requests skip the handshake"""
+        connections = []
+        try:
+            for _ in range(pool_min_size):
+                connections.append(self.engine.connect())
+        except Exception as e:
+            print(f"Error prewarming connection pool: {e}")
+        finally:
+            for connection in connections:
+                connection.close()
 
     def store_conversation(self, session_id: str, user_id: Optional[str], conversation_history: list, last_conversation_time: str, start_conversation_time: str):
         session = Session()
@@ -74,6 +100,46 @@ class PostgresClient:
         finally:
             session.close()
 
+    def store_conversations_bulk(self, rows: List[tuple]):
+        """Upsert many (session_id, user_id, conversation_history, last_conversation_time,
+        start_conversation_time) rows in one multi-row INSERT ... ON CONFLICT statement.
+        Raises on failure so callers know the rows were not stored."""
+        # A statement may only touch each session once, so keep the latest row per session
+        latest = {row[0]: row for row in rows}
+        values = [
+            {
+                'session_id': session_id,
+                'user_id': user_id if user_id else None,
+                'last_conversation_time': datetime.fromtimestamp(float(last_conversation_time)),
+                'start_conversation_time': datetime.fromtimestamp(float(start_conversation_time)),
+                'conversation_data': json.dumps(conversation_history)
+            }
+            for session_id, user_id, conversation_history, last_conversation_time, start_conversation_time in latest.values()
+        ]
+        if not values:
+            return
+
+        statement = insert(ConversationHistory).values(values)
+        statement = statement.on_conflict_do_update(
+            index_elements=[ConversationHistory.session_id],
+            set_={
+                'user_id': statement.excluded.user_id,
+                'last_conversation_time': statement.excluded.last_conversation_time,
+                'start_conversation_time': statement.excluded.start_conversation_time,
+                'conversation_data': statement.excluded.conversation_data
+            }
+        )
+
+        session = Session()
+        try:
+            session.execute(statement)
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
     def fetch_conversation(self, session_id: str):
         session = Session()
         try:
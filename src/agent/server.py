@@ -32,10 +32,11 @@ from fastapi.encoders import jsonable_encoder
 from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
 from starlette.status import HTTP_422_UNPROCESSABLE_ENTITY
 from pydantic import BaseModel, Field, validator, constr
 from src.agent.cache.session_manager import SessionManager
-from src.agent.datastore.datastore import Datastore
+from src.agent.datastore.datastore import get_datastore
 from src.agent.utils import remove_state_from_checkpointer
 
 from langgraph.errors import GraphRecursionError
@@ -76,6 +77,49 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Requests currently being served, exported on /metrics for the agent HPA
+INFLIGHT_REQUESTS = prometheus_client.Gauge(
+    "agent_inflight_requests", "Number of HTTP requests currently being processed by the agent"
+)
+
+class InflightRequestsMiddleware:
+    """Count each request until its last response body chunk is sent.
+
+    Plain ASGI rather than @app.middleware("http"), whose call_next returns as
+    soon as a StreamingResponse is created, before /generate does its LLM work.
+    Prometheus scrapes of /metrics are not counted.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] == "/metrics":
+            await self.app(scope, receive, send)
+            return
+
+        INFLIGHT_REQUESTS.inc()
+        finished = False
+
+        def finish():
+            nonlocal finished
+            if not finished:
+                finished = True
+                INFLIGHT_REQUESTS.dec()
+
+        async def send_and_track(message):
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                finish()
+
+        try:
+            await self.app(scope, receive, send_and_track)
+        finally:
+            # Errors and client disconnects end the request without a final chunk
+            finish()
+
+app.add_middleware(InflightRequestsMiddleware)
+
 EXAMPLE_DIR = "./"
 
 # List of fallback responses sent out for any Exceptions from /generate endpoint
@@ -193,7 +237,13 @@ def import_example() -> None:
     app.session_manager = SessionManager()
 
     # Initialize database to store conversation permanently
-    app.database = Datastore()
+    app.database = get_datastore()
+
+
+@app.on_event("shutdown")
+def flush_datastore() -> None:
+    """Write out buffered conversations before the process exits."""
+    app.database.flush()
 
 @app.exception_handler(RequestValidationError)
 async def request_validation_exception_handler(
@@ -307,7 +357,8 @@ async def delete_session(session_id):
     app.session_manager.delete_conversation(session_id)
 
     logger.info(f"Deleting conversation for {session_id} in database")
-    app.database.delete_conversation(session_id)
+    # Waits for the session's queued writes and the database, so keep it off the event loop
+    await run_in_threadpool(app.database.delete_conversation, session_id)
 
     logger.info(f"Deleting checkpointer for {session_id}")
     remove_state_from_checkpointer(session_id)
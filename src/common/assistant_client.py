@@ -3,58 +3,129 @@ AI Virtual Assistant Client
 Easy-to-use Python client for interacting with the assistant
 """
 
-import requests
+import httpx
+import importlib.util
 import json
+import random
 import time
-from typing import Dict, List, Optional, Any
+from typing import Dict, Optional
 from dataclasses import dataclass
 import logging
 
+try:
+    from orjson import dumps as json_dumps, loads as json_loads
+except ImportError:
+    json_dumps = json.dumps
+    json_loads = json.loads
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# Accept header per response format; JSON stays acceptable so servers without
+# MessagePack support still answer
+ACCEPT_HEADERS = {
+    "json": "application/json",
+    "msgpack": "application/msgpack, application/json;q=0.9",
+}
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
+# httpx logs every request at INFO
+logging.getLogger("httpx").setLevel(logging.WARNING)
 
-@dataclass
+@dataclass(slots=True)
 class AssistantConfig:
     """Configuration for the assistant client"""
     base_url: str = "http://localhost:8000"
     timeout: int = 30
     retry_attempts: int = 3
     retry_delay: float = 1.0
+    max_keepalive_connections: int = 64
+    max_connections: int = 128
+    response_format: str = "json"
 
 class AssistantClient:
     """Client for interacting with the AI Virtual Assistant"""
     
     def __init__(self, config: Optional[AssistantConfig] = None):
         self.config = config or AssistantConfig()
-        self.session = requests.Session()
-        self.session.headers.update({
-            'Content-Type': 'application/json',
-            'User-Agent': 'AI-Virtual-Assistant-Client/1.0'
-        })
+        if self.config.response_format not in ACCEPT_HEADERS:
+            raise ValueError(f"Unsupported response format: {self.config.response_format}")
+        if self.config.response_format == "msgpack" and msgpack is None:
+            raise ImportError("msgpack is required for MessagePack responses. Install with: pip install msgpack")
+        # Endpoints start with "/", so a trailing slash on the base URL is dropped once here
+        self._base_url = self.config.base_url.rstrip('/')
+        # One pooled client for the lifetime of the assistant client; HTTP/2
+        # multiplexes requests over a single connection when h2 is installed
+        self.session = httpx.Client(
+            http2=importlib.util.find_spec("h2") is not None,
+            limits=httpx.Limits(
+                max_keepalive_connections=self.config.max_keepalive_connections,
+                max_connections=self.config.max_connections
+            ),
+            follow_redirects=True,
+            headers={
+                'Content-Type': 'application/json',
+                'Accept': ACCEPT_HEADERS[self.config.response_format],
+                'User-Agent': 'AI-Virtual-Assistant-Client/1.0'
+            }
+        )
+
+    def close(self):
+        """Close the underlying connection pool"""
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
     
     def _make_request(self, method: str, endpoint: str, data: Optional[Dict] = None, **kwargs) -> Dict:
         """Make HTTP request with retry logic"""
-        url = f"{self.config.base_url}{endpoint}"
+        url = f"{self._base_url}{endpoint}"
         
         for attempt in range(self.config.retry_attempts):
             try:
                 response = self.session.request(
                     method=method,
                     url=url,
-                    json=data,
+                    content=None if data is None else json_dumps(data),
                     timeout=self.config.timeout,
                     **kwargs
                 )
                 response.raise_for_status()
-                return response.json()
+                return self._decode(response)
                 
-            except requests.exceptions.RequestException as e:
+            except httpx.HTTPError as e:
                 logger.warning(f"Request attempt {attempt + 1} failed: {e}")
+                if not self._is_retryable(e):
+                    raise Exception(f"Request failed: {e}")
                 if attempt < self.config.retry_attempts - 1:
-                    time.sleep(self.config.retry_delay)
+                    # Exponential backoff with +/-10% jitter so clients don't retry in lockstep
+                    delay = self.config.retry_delay * (2 ** attempt)
+                    delay += random.uniform(-0.1, 0.1) * delay
+                    time.sleep(max(0.0, delay))
                 else:
                     raise Exception(f"All {self.config.retry_attempts} attempts failed: {e}")
+
+    @staticmethod
+    def _decode(response: httpx.Response) -> Dict:
+        """Decode a response body by its content type"""
+        if msgpack is not None and "msgpack" in response.headers.get("content-type", ""):
+            # MessagePack maps may have non-string keys, e.g. integers
+            return msgpack.unpackb(response.content, raw=False, strict_map_key=False)
+        return json_loads(response.content)
+
+    @staticmethod
+    def _is_retryable(error: httpx.HTTPError) -> bool:
+        """Only connection problems, timeouts and 5xx responses can succeed on retry"""
+        if isinstance(error, httpx.HTTPStatusError):
+            return error.response.status_code >= 500
+        return isinstance(error, httpx.TransportError)
     
     def health_check(self) -> Dict:
         """Check if the assistant service is healthy"""
@@ -174,16 +245,22 @@ class AssistantClient:
 # Convenience functions for quick usage
 def quick_chat(message: str, base_url: str = "http://localhost:8000") -> str:
     """Quick chat function for simple interactions"""
-    client = AssistantClient(AssistantConfig(base_url=base_url))
-    try:
-        response = client.chat(message)
-        return response.get('response', 'No response received')
-    except Exception as e:
-        return f"Error: {e}"
+    with AssistantClient(AssistantConfig(base_url=base_url)) as client:
+        try:
+            response = client.chat(message)
+            return response.get('response', 'No response received')
+        except Exception as e:
+            return f"Error: {e}"
+
+def interactive_chat(base_url: str = "http://localhost:8000", client: Optional[AssistantClient] = None):
+    """Start an interactive chat session
 
-def interactive_chat(base_url: str = "http://localhost:8000"):
-    """Start an interactive chat session"""
-    client = AssistantClient(AssistantConfig(base_url=base_url))
+    Every turn goes through one client, so its connection is reused; a client
+    passed in is left open for the caller to close.
+    """
+    if client is None:
+        with AssistantClient(AssistantConfig(base_url=base_url)) as client:
+            return interactive_chat(base_url, client)
     
     print("🤖 AI Virtual Assistant - Interactive Chat")
     print("Type 'quit' or 'exit' to end the session")
@@ -171,6 +171,11 @@ class LLMConfig(ConfigWizard):
         default="",
         help_txt="DataRobot deployment ID for LLM inference",
     )
+    datarobot_cache_enabled: bool = configfield(
+        "datarobot_cache_enabled",
+        default=False,
+        help_txt="Reuse DataRobot responses for repeated and near-duplicate prompts",
+    )
 
 @configclass
 class TextSplitterConfig(ConfigWizard):
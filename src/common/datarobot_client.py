@@ -14,9 +14,15 @@
 # limitations under the License.
 
 """DataRobot client adapter for AI Virtual Assistant."""
-import os
+import ast
+import asyncio
+import base64
+import binascii
+import hashlib
+import json
 import logging
-from typing import List, Optional, Dict, Any
+import threading
+from typing import Iterator, List, Optional, Dict, Any, Union
 from dataclasses import dataclass
 
 try:
@@ -27,9 +33,40 @@ except ImportError:
     dr = None
     logging.warning("DataRobot SDK not installed. Install with: pip install datarobot")
 
+try:
+    import httpx
+except ImportError:
+    httpx = None
+    logging.warning("httpx not installed. Install with: pip install 'httpx[http2]'")
+
+try:
+    from orjson import dumps as json_dumps, loads as json_loads
+except ImportError:
+    json_dumps = json.dumps
+    json_loads = json.loads
+
+try:
+    from cachetools import LRUCache
+except ImportError:
+    LRUCache = None
+    logging.warning("cachetools not installed. Install with: pip install cachetools")
+
 logger = logging.getLogger(__name__)
 
-@dataclass
+# Prompt line prefix per chat role; messages with other roles are left out
+_ROLE_PREFIXES = {"system": "System", "user": "User", "assistant": "Assistant"}
+
+# Statuses from deployments that have no streaming chat completions route
+_STREAM_UNSUPPORTED = {400, 404, 405}
+
+# The SDK keeps one global client, and direct requests share one connection pool,
+# so both are created once per process rather than per DataRobot client
+_dr_client_singleton = None
+_dr_client_settings = None
+_http_client_singleton = None
+_singleton_lock = threading.Lock()
+
+@dataclass(slots=True)
 class DataRobotConfig:
     """Configuration for DataRobot endpoints."""
     api_token: str
@@ -38,21 +75,44 @@ class DataRobotConfig:
     model_name: str
     max_retries: int = 3
     timeout: int = 300
+    max_concurrency: int = 16
+    cache_enabled: bool = False
+    cache_size: int = 4096
+    semantic_cache_threshold: float = 0.95
 
 class DataRobotLLMClient:
-    """DataRobot client for LLM inference."""
+    """DataRobot client for LLM inference.
+
+    With ``config.cache_enabled`` identical prompts are answered from an LRU cache.
+    Given an embeddings client as well, first-turn chats whose user question
+    embedding is within ``config.semantic_cache_threshold`` cosine similarity of
+    an earlier one under the same system prompt reuse that response.
+    """
     
-    def __init__(self, config: DataRobotConfig):
+    def __init__(self, config: DataRobotConfig, embeddings: Optional["DataRobotEmbeddingsClient"] = None):
         self.config = config
-        self._client = None
         self._deployment = None
+        self._http = None
+        self._stream_supported = True
+        self._embeddings = embeddings
+        self._cache = _new_cache(config)
+        # cachetools caches are not thread-safe and LangChain calls from thread pools
+        self._cache_lock = threading.Lock()
+        self._semantic_cache = None
+        if self._cache is not None and embeddings is not None:
+            self._semantic_cache = _SemanticCache(config.cache_size, config.semantic_cache_threshold)
         self._initialize_client()
     
     def _initialize_client(self):
         """Initialize DataRobot client."""
         try:
-            dr.Client(token=self.config.api_token, endpoint=self.config.endpoint)
+            _ensure_dr_client(self.config.api_token, self.config.endpoint)
             self._deployment = Deployment.get(self.config.deployment_id)
+            if httpx is not None:
+                self._predict_url, self._headers = _prediction_endpoint(self.config, self._deployment)
+                self._headers["Content-Type"] = "application/json"
+                self._http = _ensure_http_client()
+                self._chat_url = f"{_api_url(self.config)}/deployments/{self.config.deployment_id}/chat/completions"
             logger.info(f"Initialized DataRobot client for deployment: {self.config.deployment_id}")
         except Exception as e:
             logger.error(f"Failed to initialize DataRobot client: {e}")
@@ -60,14 +120,31 @@ class DataRobotLLMClient:
     
     def predict(self, prompt: str, **kwargs) -> str:
         """Generate text prediction from prompt."""
+        if self._cache is not None:
+            key = hashlib.blake2b(prompt.encode()).digest()
+            with self._cache_lock:
+                response = self._cache.get(key)
+            if response is None:
+                response = self._predict(prompt)
+                with self._cache_lock:
+                    self._cache[key] = response
+            return response
+        return self._predict(prompt)
+
+    def _predict(self, prompt: str) -> str:
+        """Score a single prompt against the deployment."""
         try:
-            # Prepare prediction data
-            prediction_data = dr.Dataset.from_dataframe(
-                pd.DataFrame([{"prompt": prompt}])
-            )
-            
-            # Make prediction
-            predictions = self._deployment.predict(prediction_data)
+            if self._http is not None:
+                # Post the row directly; a one-row DataFrame costs more than the request body
+                response = self._http.post(self._predict_url, content=json_dumps([{"prompt": prompt}]),
+                                           headers=self._headers, timeout=self.config.timeout)
+                response.raise_for_status()
+                predictions = [row.get("prediction") for row in json_loads(response.content)["data"]]
+            else:
+                prediction_data = dr.Dataset.from_dataframe(
+                    pd.DataFrame({"prompt": [prompt]})
+                )
+                predictions = self._deployment.predict(prediction_data)
             
             if predictions and len(predictions) > 0:
                 return str(predictions[0])
@@ -77,95 +154,204 @@ class DataRobotLLMClient:
         except Exception as e:
             logger.error(f"DataRobot prediction failed: {e}")
             raise
+
+    async def predict_many(self, prompts: List[str]) -> List[str]:
+        """Generate predictions for many prompts with overlapping requests."""
+        try:
+            async with _AsyncPredictionSession(self.config, self._deployment) as session:
+                predictions = await asyncio.gather(
+                    *(session.predict([{"prompt": prompt}]) for prompt in prompts)
+                )
+            return [str(prediction[0]) for prediction in predictions]
+
+        except Exception as e:
+            logger.error(f"DataRobot batch prediction failed: {e}")
+            raise
+
+    def predict_batch(self, prompts: List[str]) -> List[str]:
+        """Synchronous wrapper around predict_many for callers without an event loop."""
+        return asyncio.run(self.predict_many(prompts))
     
     def chat(self, messages: List[Dict[str, str]], **kwargs) -> str:
         """Generate chat response from messages."""
         # Convert messages to a single prompt
         prompt = self._format_messages_to_prompt(messages)
-        return self.predict(prompt, **kwargs)
+
+        # Later turns depend on the whole conversation, so only opening
+        # questions are matched by meaning
+        if (self._semantic_cache is None or not messages or messages[-1].get("role") != "user"
+                or any(message.get("role") == "assistant" for message in messages)):
+            return self.predict(prompt, **kwargs)
+
+        # Only the question is embedded, since a long shared system prompt would make
+        # every prompt look alike; the preceding messages must match exactly instead
+        question = messages[-1].get("content", "")
+        scope = self._format_messages_to_prompt(messages[:-1])
+        embedding = self._embeddings.embed_documents([question], return_numpy=True)[0]
+        response = self._semantic_cache.get(scope, embedding)
+        if response is None:
+            response = self.predict(prompt, **kwargs)
+            self._semantic_cache.add(scope, embedding, response)
+        return response
     
+    def chat_stream(self, messages: List[Dict[str, str]], stop: Optional[List[str]] = None) -> Iterator[str]:
+        """Yield the chat response in pieces as the deployment generates it.
+
+        Uses the deployment's chat completions route with ``stream`` set; deployments
+        without one answer in a single piece through ``chat``.
+        """
+        if self._http is not None and self._stream_supported:
+            payload = {"model": self.config.model_name, "messages": messages, "stream": True}
+            if stop:
+                payload["stop"] = stop
+            with self._http.stream("POST", self._chat_url, content=json_dumps(payload),
+                                   headers=self._headers, timeout=self.config.timeout) as response:
+                if response.status_code not in _STREAM_UNSUPPORTED:
+                    response.raise_for_status()
+                    for line in response.iter_lines():
+                        if not line.startswith("data:"):
+                            continue
+                        data = line[5:].strip()
+                        if data == "[DONE]":
+                            break
+                        choices = json_loads(data).get("choices") or [{}]
+                        delta = (choices[0].get("delta") or {}).get("content")
+                        if delta:
+                            yield delta
+                    return
+            logger.info(f"Deployment {self.config.deployment_id} does not stream chat (HTTP {response.status_code})")
+            self._stream_supported = False
+
+        yield self.chat(messages)
+
     def _format_messages_to_prompt(self, messages: List[Dict[str, str]]) -> str:
         """Format chat messages into a single prompt string."""
-        formatted_prompt = ""
-        for message in messages:
-            role = message.get("role", "user")
-            content = message.get("content", "")
-            if role == "system":
-                formatted_prompt += f"System: {content}\n"
-            elif role == "user":
-                formatted_prompt += f"User: {content}\n"
-            elif role == "assistant":
-                formatted_prompt += f"Assistant: {content}\n"
-        
-        formatted_prompt += "Assistant:"
-        return formatted_prompt
+        parts = [
+            f"{_ROLE_PREFIXES[role]}: {message.get('content', '')}\n"
+            for message in messages
+            if (role := message.get("role", "user")) in _ROLE_PREFIXES
+        ]
+        parts.append("Assistant:")
+        return "".join(parts)
 
 class DataRobotEmbeddingsClient:
     """DataRobot client for embeddings."""
     
     def __init__(self, config: DataRobotConfig):
         self.config = config
-        self._client = None
         self._deployment = None
+        self._query_cache = _new_cache(config)
+        self._cache_lock = threading.Lock()
         self._initialize_client()
     
     def _initialize_client(self):
         """Initialize DataRobot client."""
         try:
-            dr.Client(token=self.config.api_token, endpoint=self.config.endpoint)
+            _ensure_dr_client(self.config.api_token, self.config.endpoint)
             self._deployment = Deployment.get(self.config.deployment_id)
             logger.info(f"Initialized DataRobot embeddings client for deployment: {self.config.deployment_id}")
         except Exception as e:
             logger.error(f"Failed to initialize DataRobot embeddings client: {e}")
             raise
     
-    def embed_documents(self, texts: List[str]) -> List[List[float]]:
-        """Generate embeddings for a list of documents."""
+    def embed_documents(self, texts: List[str], batch_size: int = 512,
+                        return_numpy: bool = False) -> Union[List[List[float]], "np.ndarray"]:
+        """Generate embeddings for a list of documents.
+
+        Texts are sent ``batch_size`` rows at a time, one prediction call per batch.
+        Embeddings are collected in a float32 array of shape (len(texts), D), returned
+        as is when ``return_numpy`` is set and as nested lists otherwise.
+        """
         try:
-            embeddings = []
-            for text in texts:
+            embeddings = None
+            for start in range(0, len(texts), batch_size):
+                batch = texts[start:start + batch_size]
+
                 # Prepare prediction data
                 prediction_data = dr.Dataset.from_dataframe(
-                    pd.DataFrame([{"text": text}])
+                    pd.DataFrame({"text": np.array(batch, dtype=object)})
                 )
-                
+
                 # Make prediction
-                prediction = self._deployment.predict(prediction_data)
-                
-                if prediction and len(prediction) > 0:
-                    # Assuming the prediction returns a list of floats
-                    embedding = prediction[0]
-                    if isinstance(embedding, str):
-                        # Parse string representation if needed
-                        embedding = eval(embedding)
-                    embeddings.append(embedding)
-                else:
-                    raise ValueError(f"No embedding returned for text: {text[:100]}...")
-            
-            return embeddings
-            
+                prediction = _prediction_values(self._deployment.predict(prediction_data))
+                embeddings = _fill_embeddings(embeddings, len(texts), start,
+                                              self._parse_embeddings(batch, prediction))
+
+            return _embeddings_result(embeddings, return_numpy)
+
         except Exception as e:
             logger.error(f"DataRobot embeddings failed: {e}")
             raise
-    
+
+    async def embed_documents_async(self, texts: List[str], batch_size: int = 512,
+                                    return_numpy: bool = False) -> Union[List[List[float]], "np.ndarray"]:
+        """Generate embeddings with all batches in flight at once."""
+        try:
+            starts = range(0, len(texts), batch_size)
+            async with _AsyncPredictionSession(self.config, self._deployment) as session:
+                predictions = await asyncio.gather(
+                    *(session.predict([{"text": text} for text in texts[start:start + batch_size]])
+                      for start in starts)
+                )
+
+            embeddings = None
+            for start, prediction in zip(starts, predictions):
+                embeddings = _fill_embeddings(embeddings, len(texts), start,
+                                              self._parse_embeddings(texts[start:start + batch_size], prediction))
+            return _embeddings_result(embeddings, return_numpy)
+
+        except Exception as e:
+            logger.error(f"DataRobot embeddings failed: {e}")
+            raise
+
+    def embed_documents_concurrent(self, texts: List[str], batch_size: int = 512,
+                                   return_numpy: bool = False) -> Union[List[List[float]], "np.ndarray"]:
+        """Synchronous wrapper around embed_documents_async for callers without an event loop."""
+        return asyncio.run(self.embed_documents_async(texts, batch_size, return_numpy))
+
+    @staticmethod
+    def _parse_embeddings(batch: List[str], prediction: list) -> "np.ndarray":
+        """Check that a batch got one embedding per text and decode them into a (len(batch), D) array."""
+        if len(prediction) != len(batch):
+            raise ValueError(
+                f"Expected {len(batch)} embeddings, got {len(prediction)} "
+                f"for batch starting with: {batch[0][:100]}..."
+            )
+
+        return np.stack([_decode_embedding(embedding) for embedding in prediction])
+
     def embed_query(self, text: str) -> List[float]:
         """Generate embedding for a single query."""
+        if self._query_cache is not None:
+            with self._cache_lock:
+                cached = self._query_cache.get(text)
+            if cached is not None:
+                return cached.tolist()
+
         embeddings = self.embed_documents([text])
-        return embeddings[0] if embeddings else []
+        embedding = embeddings[0] if embeddings else []
+        if self._query_cache is not None:
+            # Compact float32 copy, read-only so a cached vector can't be mutated in place
+            cached = np.asarray(embedding, dtype=np.float32)
+            cached.flags.writeable = False
+            with self._cache_lock:
+                self._query_cache[text] = cached
+            # Same float32 values a later cache hit will return
+            return cached.tolist()
+        return embedding
 
 class DataRobotRerankClient:
     """DataRobot client for reranking."""
     
     def __init__(self, config: DataRobotConfig):
         self.config = config
-        self._client = None
         self._deployment = None
         self._initialize_client()
     
     def _initialize_client(self):
         """Initialize DataRobot client."""
         try:
-            dr.Client(token=self.config.api_token, endpoint=self.config.endpoint)
+            _ensure_dr_client(self.config.api_token, self.config.endpoint)
             self._deployment = Deployment.get(self.config.deployment_id)
             logger.info(f"Initialized DataRobot rerank client for deployment: {self.config.deployment_id}")
         except Exception as e:
@@ -175,47 +361,223 @@ class DataRobotRerankClient:
     def rerank(self, query: str, documents: List[str], top_k: int = None) -> List[Dict[str, Any]]:
         """Rerank documents based on query relevance."""
         try:
-            results = []
-            
-            for i, doc in enumerate(documents):
-                # Prepare prediction data with query and document
-                prediction_data = dr.Dataset.from_dataframe(
-                    pd.DataFrame([{
-                        "query": query,
-                        "document": doc,
-                        "document_index": i
-                    }])
-                )
-                
-                # Make prediction
-                prediction = self._deployment.predict(prediction_data)
-                
-                if prediction and len(prediction) > 0:
-                    score = float(prediction[0])
-                    results.append({
-                        "document": doc,
-                        "score": score,
-                        "index": i
-                    })
-                else:
-                    logger.warning(f"No rerank score returned for document {i}")
-            
-            # Sort by score (higher is better)
-            results.sort(key=lambda x: x["score"], reverse=True)
-            
-            # Apply top_k if specified
-            if top_k is not None:
-                results = results[:top_k]
-            
-            return results
+            if not documents:
+                return []
+
+            # Score every (query, document) pair in a single prediction call; the
+            # query column repeats one string object rather than copying it per row
+            count = len(documents)
+            prediction_data = dr.Dataset.from_dataframe(
+                pd.DataFrame({
+                    "query": np.full(count, query, dtype=object),
+                    "document": np.array(documents, dtype=object),
+                    "document_index": np.arange(count)
+                })
+            )
+
+            # Make prediction
+            scores = np.asarray(_prediction_values(self._deployment.predict(prediction_data)), dtype=np.float64)
+
+            if len(scores) != len(documents):
+                raise ValueError(f"Expected {len(documents)} rerank scores, got {len(scores)}")
+
+            # Rank by score (higher is better); with a small top_k only those are sorted
+            negated = -scores
+            if top_k is not None and 0 < top_k < len(scores):
+                # argpartition returns its picks in no particular order; sorting them first lets
+                # the stable sort break ties by input order. Which of several documents tied at
+                # the top_k cutoff make the cut is still up to argpartition.
+                indices = np.sort(np.argpartition(negated, top_k - 1)[:top_k])
+                indices = indices[np.argsort(negated[indices], kind="stable")]
+            else:
+                indices = np.argsort(negated, kind="stable")
+                if top_k is not None:
+                    indices = indices[:top_k]
+
+            return [
+                {"document": documents[i], "score": float(scores[i]), "index": i}
+                for i in indices.tolist()
+            ]
             
         except Exception as e:
             logger.error(f"DataRobot reranking failed: {e}")
             raise
 
+class _AsyncPredictionSession:
+    """Posts rows straight to a deployment's prediction API over one HTTP/2 connection pool.
+
+    Use as ``async with``; at most ``config.max_concurrency`` requests are in flight.
+    """
+
+    def __init__(self, config: DataRobotConfig, deployment: "Deployment"):
+        if httpx is None:
+            raise ImportError("httpx is required for async predictions. Install with: pip install 'httpx[http2]'")
+
+        self._timeout = config.timeout
+        self._max_concurrency = config.max_concurrency
+        self._url, self._headers = _prediction_endpoint(config, deployment)
+        self._headers["Content-Type"] = "application/json"
+
+    async def __aenter__(self) -> "_AsyncPredictionSession":
+        self._client = httpx.AsyncClient(http2=True, timeout=self._timeout, headers=self._headers)
+        self._semaphore = asyncio.Semaphore(self._max_concurrency)
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self._client.aclose()
+
+    async def predict(self, rows: List[Dict[str, Any]]) -> list:
+        """Score rows and return their predictions in order."""
+        async with self._semaphore:
+            response = await self._client.post(self._url, content=json_dumps(rows))
+        response.raise_for_status()
+        return [row.get("prediction") for row in json_loads(response.content)["data"]]
+
+def _ensure_dr_client(token: str, endpoint: str) -> "dr.Client":
+    """Configure the SDK's global client, reusing it while the credentials are unchanged."""
+    global _dr_client_singleton, _dr_client_settings
+    with _singleton_lock:
+        if _dr_client_singleton is None or _dr_client_settings != (token, endpoint):
+            _dr_client_singleton = dr.Client(token=token, endpoint=endpoint)
+            _dr_client_settings = (token, endpoint)
+        return _dr_client_singleton
+
+def _ensure_http_client() -> "httpx.Client":
+    """Return the process-wide HTTP/2 client used for direct prediction requests."""
+    global _http_client_singleton
+    with _singleton_lock:
+        if _http_client_singleton is None:
+            _http_client_singleton = httpx.Client(http2=True)
+        return _http_client_singleton
+
+def _api_url(config: DataRobotConfig) -> str:
+    """Return the public API base URL (ending in /api/v2) for the configured endpoint."""
+    api_url = config.endpoint.rstrip("/")
+    if not api_url.endswith("/api/v2"):
+        api_url = f"{api_url}/api/v2"
+    return api_url
+
+def _prediction_endpoint(config: DataRobotConfig, deployment: "Deployment") -> tuple:
+    """Return the prediction URL and auth headers for a deployment."""
+    headers = {"Authorization": f"Bearer {config.api_token}"}
+    server = getattr(deployment, "default_prediction_server", None) or {}
+    if server.get("url"):
+        url = f"{server['url'].rstrip('/')}/predApi/v1.0/deployments/{deployment.id}/predictions"
+        if server.get("datarobot-key"):
+            headers["DataRobot-Key"] = server["datarobot-key"]
+        return url, headers
+
+    # Serverless deployments are scored through the public API
+    return f"{_api_url(config)}/deployments/{deployment.id}/predictions", headers
+
+class _SemanticCache:
+    """Responses keyed by question embedding, matched by cosine similarity.
+
+    Entries only match lookups with the same scope (the conversation before the
+    question). Holds up to ``maxsize`` unit vectors in a ring buffer and scans
+    them with one matrix-vector product per lookup. Safe to share between threads.
+    """
+
+    def __init__(self, maxsize: int, threshold: float):
+        self._maxsize = maxsize
+        self._threshold = threshold
+        self._lock = threading.Lock()
+        self._vectors = None
+        self._scopes = np.zeros(maxsize, dtype=np.uint64)
+        self._responses: List[str] = []
+        self._next = 0
+
+    def get(self, scope: str, embedding: "np.ndarray") -> Optional[str]:
+        """Return the cached response closest to the embedding, if similar enough."""
+        vector = _unit(embedding)
+        scope_id = _scope_id(scope)
+        with self._lock:
+            count = len(self._responses)
+            if not count:
+                return None
+            similarities = self._vectors[:count] @ vector
+            similarities[self._scopes[:count] != scope_id] = -np.inf
+            best = int(np.argmax(similarities))
+            return self._responses[best] if similarities[best] >= self._threshold else None
+
+    def add(self, scope: str, embedding: "np.ndarray", response: str) -> None:
+        """Remember a response, evicting the oldest entry when full."""
+        vector = _unit(embedding)
+        scope_id = _scope_id(scope)
+        with self._lock:
+            if self._vectors is None:
+                self._vectors = np.empty((self._maxsize, len(vector)), dtype=np.float32)
+            slot = self._next
+            self._vectors[slot] = vector
+            self._scopes[slot] = scope_id
+            if len(self._responses) < self._maxsize:
+                self._responses.append(response)
+            else:
+                self._responses[slot] = response
+            self._next = (slot + 1) % self._maxsize
+
+def _scope_id(scope: str) -> int:
+    """64-bit hash of a semantic cache scope."""
+    return int.from_bytes(hashlib.blake2b(scope.encode(), digest_size=8).digest(), "little")
+
+def _unit(vector: "np.ndarray") -> "np.ndarray":
+    """Scale a vector to unit length so dot products are cosine similarities."""
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+def _new_cache(config: DataRobotConfig) -> Optional["LRUCache"]:
+    """LRU cache for a client, or None when caching is off or cachetools is missing."""
+    if not config.cache_enabled or LRUCache is None:
+        return None
+    return LRUCache(maxsize=config.cache_size)
+
+def _decode_embedding(embedding: Any) -> "np.ndarray":
+    """Decode an embedding returned as a list, a JSON array string or base64 float32 bytes."""
+    if not isinstance(embedding, str):
+        return np.asarray(embedding, dtype=np.float32)
+
+    text = embedding.strip()
+    if text.startswith("["):
+        try:
+            return np.asarray(json_loads(text), dtype=np.float32)
+        except ValueError:
+            # Python list reprs (e.g. with a trailing comma) are not always valid JSON
+            return np.asarray(ast.literal_eval(text), dtype=np.float32)
+
+    try:
+        raw = base64.b64decode(text, validate=True)
+    except (binascii.Error, ValueError):
+        raise ValueError(f"Unrecognised embedding format: {text[:50]}...") from None
+    return np.frombuffer(raw, dtype=np.float32)
+
+def _fill_embeddings(embeddings: Optional["np.ndarray"], total: int, start: int,
+                     batch: "np.ndarray") -> "np.ndarray":
+    """Copy a batch into the output array, allocating it once the dimension is known."""
+    if embeddings is None:
+        embeddings = np.empty((total, batch.shape[1]), dtype=np.float32)
+    embeddings[start:start + len(batch)] = batch
+    return embeddings
+
+def _embeddings_result(embeddings: Optional["np.ndarray"],
+                       return_numpy: bool) -> Union[List[List[float]], "np.ndarray"]:
+    """Convert to nested lists only at the public boundary."""
+    if embeddings is None:
+        return np.empty((0, 0), dtype=np.float32) if return_numpy else []
+    return embeddings if return_numpy else embeddings.tolist()
+
+def _prediction_values(prediction: Any) -> list:
+    """Flatten a deployment prediction (list, Series or one-column DataFrame) to a list of rows."""
+    if prediction is None:
+        return []
+    if hasattr(prediction, "to_numpy"):
+        return prediction.to_numpy().ravel().tolist()
+    return list(prediction)
+
 # Import pandas for DataFrame operations
 try:
+    import numpy as np
     import pandas as pd
 except ImportError:
+    np = None
     pd = None
     logging.warning("pandas not installed. Install with: pip install pandas")
@@ -17,8 +17,8 @@
 import logging
 from typing import Any, Iterator, List, Optional, Dict
 from langchain_core.language_models.chat_models import BaseChatModel
-from langchain_core.messages import BaseMessage, AIMessage, HumanMessage, SystemMessage
-from langchain_core.outputs import ChatResult, ChatGeneration
+from langchain_core.messages import BaseMessage, AIMessage, AIMessageChunk, HumanMessage, SystemMessage
+from langchain_core.outputs import ChatResult, ChatGeneration, ChatGenerationChunk
 from langchain_core.embeddings import Embeddings
 from langchain_core.documents.compressor import BaseDocumentCompressor
 from langchain_core.documents import Document
@@ -27,13 +27,17 @@ from .datarobot_client import DataRobotConfig, DataRobotLLMClient, DataRobotEmbe
 
 logger = logging.getLogger(__name__)
 
+# DataRobot chat role per LangChain message class; other messages are sent as user turns
+_ROLE_MAP = {SystemMessage: "system", HumanMessage: "user", AIMessage: "assistant"}
+
 class DataRobotChatModel(BaseChatModel):
     """LangChain-compatible DataRobot chat model."""
     
-    def __init__(self, config: DataRobotConfig, **kwargs):
+    def __init__(self, config: DataRobotConfig, embeddings_config: Optional[DataRobotConfig] = None, **kwargs):
         super().__init__(**kwargs)
         self.config = config
-        self._client = DataRobotLLMClient(config)
+        embeddings = DataRobotEmbeddingsClient(embeddings_config) if embeddings_config else None
+        self._client = DataRobotLLMClient(config, embeddings=embeddings)
     
     @property
     def _llm_type(self) -> str:
@@ -48,21 +52,8 @@ class DataRobotChatModel(BaseChatModel):
     ) -> ChatResult:
         """Generate chat response."""
         try:
-            # Convert LangChain messages to DataRobot format
-            dr_messages = []
-            for message in messages:
-                if isinstance(message, SystemMessage):
-                    dr_messages.append({"role": "system", "content": message.content})
-                elif isinstance(message, HumanMessage):
-                    dr_messages.append({"role": "user", "content": message.content})
-                elif isinstance(message, AIMessage):
-                    dr_messages.append({"role": "assistant", "content": message.content})
-                else:
-                    # Handle other message types as user messages
-                    dr_messages.append({"role": "user", "content": str(message.content)})
-            
             # Get response from DataRobot
-            response = self._client.chat(dr_messages, **kwargs)
+            response = self._client.chat(self._to_dr_messages(messages), **kwargs)
             
             # Create AIMessage from response
             ai_message = AIMessage(content=response)
@@ -82,11 +73,33 @@ class DataRobotChatModel(BaseChatModel):
         stop: Optional[List[str]] = None,
         run_manager: Optional[Any] = None,
         **kwargs: Any,
-    ) -> Iterator[ChatResult]:
-        """Stream chat response (not supported by DataRobot, so we return single response)."""
-        # DataRobot doesn't support streaming, so we return the full response
-        result = self._generate(messages, stop, run_manager, **kwargs)
-        yield result
+    ) -> Iterator[ChatGenerationChunk]:
+        """Stream chat response token by token as the deployment produces it."""
+        try:
+            for delta in self._client.chat_stream(self._to_dr_messages(messages), stop=stop):
+                chunk = ChatGenerationChunk(message=AIMessageChunk(content=delta))
+                if run_manager:
+                    run_manager.on_llm_new_token(delta, chunk=chunk)
+                yield chunk
+
+        except Exception as e:
+            logger.error(f"DataRobot chat streaming failed: {e}")
+            raise
+
+    @staticmethod
+    def _to_dr_messages(messages: List[BaseMessage]) -> List[Dict[str, Any]]:
+        """Convert LangChain messages to DataRobot format."""
+        dr_messages = []
+        for message in messages:
+            role = _ROLE_MAP.get(type(message))
+            if role is None:
+                # Subclasses such as message chunks keep their base class's role
+                role = next((role for cls, role in _ROLE_MAP.items() if isinstance(message, cls)), None)
+            if role is None:
+                dr_messages.append({"role": "user", "content": str(message.content)})
+            else:
+                dr_messages.append({"role": role, "content": message.content})
+        return dr_messages
 
 class DataRobotEmbeddings(Embeddings):
     """LangChain-compatible DataRobot embeddings."""
@@ -98,6 +111,10 @@ class DataRobotEmbeddings(Embeddings):
     def embed_documents(self, texts: List[str]) -> List[List[float]]:
         """Embed a list of documents."""
         return self._client.embed_documents(texts)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed a list of documents with concurrent prediction requests."""
+        return await self._client.embed_documents_async(texts)
     
     def embed_query(self, text: str) -> List[float]:
         """Embed a single query."""
@@ -117,6 +134,11 @@ class DataRobotRerank(BaseDocumentCompressor):
         query: str,
     ) -> List[Document]:
         """Rerank and compress documents based on query relevance."""
+        # Every document would be kept anyway, so scoring cannot change the result set
+        if len(documents) <= self.top_n:
+            logger.debug(f"Skipping rerank of {len(documents)} documents (top_n={self.top_n})")
+            return list(documents)
+
         try:
             # Extract text content from documents
             texts = [doc.page_content for doc in documents]
@@ -206,9 +206,19 @@ def get_llm(**kwargs) -> LLM | SimpleChatModel:
             api_token=settings.llm.datarobot_api_token,
             endpoint=settings.llm.datarobot_endpoint,
             deployment_id=settings.llm.datarobot_deployment_id,
-            model_name=settings.llm.model_name
+            model_name=settings.llm.model_name,
+            cache_enabled=settings.llm.datarobot_cache_enabled
         )
-        return DataRobotChatModel(config, **kwargs)
+        # The semantic cache matches prompts with the DataRobot embedding deployment
+        embeddings_config = None
+        if settings.llm.datarobot_cache_enabled and settings.embeddings.datarobot_embedding_deployment_id:
+            embeddings_config = DataRobotConfig(
+                api_token=settings.llm.datarobot_api_token,
+                endpoint=settings.llm.datarobot_endpoint,
+                deployment_id=settings.embeddings.datarobot_embedding_deployment_id,
+                model_name=settings.embeddings.model_name
+            )
+        return DataRobotChatModel(config, embeddings_config=embeddings_config, **kwargs)
     else:
         raise RuntimeError("Unable to find any supported Large Language Model server. Supported engine names are nvidia-ai-endpoints, datarobot.")
 
@@ -248,7 +258,8 @@ def get_embedding_model() -> Embeddings:
             api_token=settings.llm.datarobot_api_token,  # Use LLM config for API token
             endpoint=settings.llm.datarobot_endpoint,    # Use LLM config for endpoint
             deployment_id=settings.embeddings.datarobot_embedding_deployment_id,
-            model_name=settings.embeddings.model_name
+            model_name=settings.embeddings.model_name,
+            cache_enabled=settings.llm.datarobot_cache_enabled
         )
         return DataRobotEmbeddings(config)
     else:
@@ -5,20 +5,29 @@ Command-line interface for interacting with the assistant
 """
 
 import argparse
+import base64
+import functools
 import sys
-import json
+from datetime import datetime, timezone
 from pathlib import Path
 
-# Add src to path for imports
-sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+# The client is imported from src only once a command needs it, so --help and
+# usage errors don't pay for its dependencies
+SRC_DIR = Path(__file__).parent.parent / "src"
 
-from common.assistant_client import AssistantClient, AssistantConfig, interactive_chat
+DEFAULT_URL = 'http://localhost:8000'
+DEFAULT_TIMEOUT = 30
 
-def main():
-    parser = argparse.ArgumentParser(
-        description="AI Virtual Assistant CLI Tool",
-        formatter_class=argparse.RawDescriptionHelpFormatter,
-        epilog="""
+# Headings written before a response, encoded once
+HEADING_HEALTH = "✅ Service Health:\n".encode()
+HEADING_STATUS = "📊 System Status:\n".encode()
+HEADING_MODELS = "🤖 Available Models:\n".encode()
+HEADING_ANALYSIS = "\n📊 Analysis Results:\n".encode()
+HEADING_RECOMMENDATIONS = "\n💡 Recommendations:\n".encode()
+HEADING_HISTORY = "\n💬 Conversation History:\n".encode()
+
+# Usage examples shown after --help
+EPILOG = """
 Examples:
   # Start interactive chat
   python assistant_cli.py chat
@@ -34,161 +43,379 @@ Examples:
   
   # Analyze a document
   python assistant_cli.py analyze "This is a sample document text."
+  python assistant_cli.py analyze --file report.txt
   
   # Get recommendations
   python assistant_cli.py recommend "machine learning"
         """
-    )
-    
-    parser.add_argument(
-        '--url', '-u',
-        default='http://localhost:8000',
-        help='Assistant service URL (default: http://localhost:8000)'
-    )
-    
-    parser.add_argument(
-        '--timeout', '-t',
-        type=int,
-        default=30,
-        help='Request timeout in seconds (default: 30)'
-    )
-    
-    subparsers = parser.add_subparsers(dest='command', help='Available commands')
-    
-    # Health check command
+
+# JSON libraries are imported on first use so --help never loads them; the
+# stdlib module only when orjson is unavailable or rejects the input
+_orjson = False
+
+
+def _get_orjson():
+    """Return the orjson module, or None when it is not installed"""
+    global _orjson
+    if _orjson is False:
+        try:
+            import orjson
+        except ImportError:
+            orjson = None
+        _orjson = orjson
+    return _orjson
+
+
+def _json_default(obj):
+    """Serialize values JSON has no type for; bytes from MessagePack become base64 text
+
+    For the stdlib encoder, also what orjson handles natively.
+    """
+    if isinstance(obj, (bytes, bytearray)):
+        return base64.b64encode(obj).decode('ascii')
+    if isinstance(obj, datetime) and obj.tzinfo is None:
+        # Matches orjson.OPT_NAIVE_UTC
+        obj = obj.replace(tzinfo=timezone.utc)
+    if hasattr(obj, 'isoformat'):
+        return obj.isoformat()
+    return str(obj)
+
+
+def _emit(obj):
+    """Write an API response to stdout without building the whole string first
+
+    Output is indented for a terminal and compact when piped to another program.
+    Datetimes and UUIDs are written as strings; orjson handles them natively.
+    Non-string map keys, as MessagePack responses may have, are written as strings.
+    """
+    orjson = _get_orjson()
+    pretty = sys.stdout.isatty()
+    out = getattr(sys.stdout, 'buffer', None)
+    if orjson is not None and out is not None:
+        # Earlier print() output must reach the byte stream first
+        sys.stdout.flush()
+        option = (orjson.OPT_APPEND_NEWLINE | orjson.OPT_NAIVE_UTC | orjson.OPT_NON_STR_KEYS
+                  | (orjson.OPT_INDENT_2 if pretty else 0))
+        out.write(orjson.dumps(obj, default=_json_default, option=option))
+    else:
+        import json
+        json.dump(obj, sys.stdout, indent=2 if pretty else None,
+                  separators=None if pretty else (',', ':'), default=_json_default)
+        sys.stdout.write("\n")
+
+
+def _progress_stream():
+    """Where headings and progress lines go: stdout on a terminal, otherwise stderr
+
+    Piped output then carries only the JSON, so `assistant_cli status | jq .` works.
+    """
+    return sys.stdout if sys.stdout.isatty() else sys.stderr
+
+
+def _write_heading(heading: bytes):
+    """Write a pre-encoded heading, falling back to text when stdout has no byte stream"""
+    # Piped stdout carries only the JSON
+    if not sys.stdout.isatty():
+        sys.stderr.write(heading.decode())
+        return
+    out = getattr(sys.stdout, 'buffer', None)
+    if out is None:
+        sys.stdout.write(heading.decode())
+        return
+    # Earlier print() output must reach the byte stream first
+    sys.stdout.flush()
+    out.write(heading)
+
+
+@functools.lru_cache(maxsize=16)
+def _loads(text: str):
+    """Parse JSON from the command line, accepting anything the stdlib parser does
+
+    Results are memoised by the raw string, so callers must not modify them.
+    """
+    orjson = _get_orjson()
+    if orjson is not None:
+        try:
+            return orjson.loads(text)
+        except orjson.JSONDecodeError:
+            pass
+    import json
+    return json.loads(text)
+
+
+def _build_health(subparsers):
     subparsers.add_parser('health', help='Check service health')
-    
-    # Status command
+
+
+def _build_status(subparsers):
     subparsers.add_parser('status', help='Get system status')
-    
-    # Models command
+
+
+def _build_models(subparsers):
     subparsers.add_parser('models', help='List available models')
-    
-    # Chat command
-    chat_parser = subparsers.add_parser('chat', help='Start interactive chat')
-    
-    # Ask command
+
+
+def _build_chat(subparsers):
+    subparsers.add_parser('chat', help='Start interactive chat')
+
+
+def _build_ask(subparsers):
     ask_parser = subparsers.add_parser('ask', help='Ask a single question')
     ask_parser.add_argument('question', help='Question to ask')
     ask_parser.add_argument('--context', '-c', help='Additional context')
-    
-    # Analyze command
+
+
+def _build_analyze(subparsers):
     analyze_parser = subparsers.add_parser('analyze', help='Analyze a document')
-    analyze_parser.add_argument('text', help='Text to analyze')
+    analyze_parser.add_argument('text', nargs='?', help='Text to analyze')
+    analyze_parser.add_argument('--file', '-f', help='Read the text to analyze from a file instead')
     analyze_parser.add_argument('--type', '-t', default='general', help='Analysis type')
-    
-    # Recommend command
+
+
+def _build_recommend(subparsers):
     recommend_parser = subparsers.add_parser('recommend', help='Get recommendations')
     recommend_parser.add_argument('query', help='Search query')
     recommend_parser.add_argument('--limit', '-l', type=int, default=5, help='Number of recommendations')
-    
-    # History command
+
+
+def _build_history(subparsers):
     history_parser = subparsers.add_parser('history', help='Get conversation history')
     history_parser.add_argument('--limit', '-l', type=int, default=50, help='Number of messages')
     history_parser.add_argument('--session', '-s', help='Session ID')
-    
-    # Clear command
+
+
+def _build_clear(subparsers):
     clear_parser = subparsers.add_parser('clear', help='Clear conversation history')
     clear_parser.add_argument('--session', '-s', help='Session ID')
+
+
+# Subcommand parser builders, in the order they are listed in --help
+SUBCOMMANDS = {
+    'health': _build_health,
+    'status': _build_status,
+    'models': _build_models,
+    'chat': _build_chat,
+    'ask': _build_ask,
+    'analyze': _build_analyze,
+    'recommend': _build_recommend,
+    'history': _build_history,
+    'clear': _build_clear,
+}
+
+# Global options that take a value, which must not be mistaken for the command
+GLOBAL_VALUE_OPTIONS = {'--url', '-u', '--timeout', '-t', '--format'}
+
+
+def _selected_command(argv):
+    """Return the first positional argument, skipping global options and their values"""
+    args = iter(argv)
+    for arg in args:
+        if arg in GLOBAL_VALUE_OPTIONS:
+            next(args, None)
+        elif not arg.startswith('-'):
+            return arg
+    return None
+
+
+def _do_health(args, client):
+    result = client.health_check()
+    _write_heading(HEADING_HEALTH)
+    _emit(result)
+
+
+def _do_status(args, client):
+    result = client.get_system_status()
+    _write_heading(HEADING_STATUS)
+    _emit(result)
+
+
+def _do_models(args, client):
+    result = client.get_available_models()
+    _write_heading(HEADING_MODELS)
+    _emit(result)
+
+
+def _do_chat(args, client):
+    from common.assistant_client import interactive_chat
+    print("🤖 Starting interactive chat...")
+    interactive_chat(args.url, client=client)
+
+
+def _do_ask(args, client):
+    context = {}
+    if args.context:
+        try:
+            context = _loads(args.context)
+        except ValueError:
+            print(f"❌ Invalid JSON context: {args.context}")
+            return 1
+    
+    # Each block is written at once rather than line by line
+    parts = [f"👤 Question: {args.question}\n"]
+    if context:
+        parts.append(f"📝 Context: {args.context}\n")
+    parts.append("\n🤔 Thinking...\n")
+    sys.stdout.write("".join(parts))
+    sys.stdout.flush()
+    
+    result = client.ask_question(args.question, context=context)
+    
+    parts = [f"\n🤖 Assistant: {result.get('response', 'No response received')}\n"]
+    if 'confidence' in result:
+        parts.append(f"   Confidence: {result['confidence']:.2f}\n")
+    if 'model_used' in result:
+        parts.append(f"   Model: {result['model_used']}\n")
+    sys.stdout.write("".join(parts))
+
+
+def _do_analyze(args, client):
+    if (args.text is None) == (args.file is None):
+        print("❌ Give either the text to analyze or --file")
+        return 1
+    # Large documents are read directly rather than passed through the shell
+    if args.file is None:
+        text = args.text
+    else:
+        try:
+            text = Path(args.file).read_text(encoding='utf-8')
+        except (OSError, UnicodeDecodeError) as e:
+            print(f"❌ Could not read {args.file}: {e}")
+            return 1
+    
+    progress = _progress_stream()
+    print(f"📄 Analyzing text: {text[:100]}{'...' if len(text) > 100 else ''}", file=progress)
+    print(f"🔍 Analysis type: {args.type}", file=progress)
+    
+    result = client.analyze_document(text, args.type)
+    _write_heading(HEADING_ANALYSIS)
+    _emit(result)
+
+
+def _do_recommend(args, client):
+    progress = _progress_stream()
+    print(f"🔍 Getting recommendations for: {args.query}", file=progress)
+    print(f"📊 Limit: {args.limit}", file=progress)
+    
+    result = client.get_recommendations(args.query, args.limit)
+    _write_heading(HEADING_RECOMMENDATIONS)
+    _emit(result)
+
+
+def _do_history(args, client):
+    progress = _progress_stream()
+    print(f"📚 Getting conversation history...", file=progress)
+    if args.session:
+        print(f"   Session ID: {args.session}", file=progress)
+    print(f"   Limit: {args.limit}", file=progress)
+    
+    result = client.get_conversation_history(args.session, args.limit)
+    _write_heading(HEADING_HISTORY)
+    _emit(result)
+
+
+def _do_clear(args, client):
+    if args.session:
+        print(f"🧹 Clearing conversation history for session: {args.session}")
+    else:
+        print("🧹 Clearing all conversation history...")
+    
+    result = client.clear_conversation(args.session)
+    print(f"✅ {result.get('message', 'History cleared')}")
+
+
+# Command handlers; each returns an exit status, or None for success
+COMMANDS = {
+    'health': _do_health,
+    'status': _do_status,
+    'models': _do_models,
+    'chat': _do_chat,
+    'ask': _do_ask,
+    'analyze': _do_analyze,
+    'recommend': _do_recommend,
+    'history': _do_history,
+    'clear': _do_clear,
+}
+
+
+def main():
+    # `ask "question"` with no options is the common case and needs no parser
+    if len(sys.argv) == 3 and sys.argv[1] == 'ask' and not sys.argv[2].startswith('-'):
+        return _run(argparse.Namespace(command='ask', question=sys.argv[2], context=None,
+                                       url=DEFAULT_URL, timeout=DEFAULT_TIMEOUT, format='json'))
+
+    # Usage examples, and the formatter that keeps their layout, are only
+    # needed when help is shown
+    help_args = {}
+    if '-h' in sys.argv or '--help' in sys.argv:
+        help_args = {'formatter_class': argparse.RawDescriptionHelpFormatter, 'epilog': EPILOG}
+    parser = argparse.ArgumentParser(
+        description="AI Virtual Assistant CLI Tool",
+        **help_args
+    )
+    
+    parser.add_argument(
+        '--url', '-u',
+        default=DEFAULT_URL,
+        help=f'Assistant service URL (default: {DEFAULT_URL})'
+    )
+    
+    parser.add_argument(
+        '--timeout', '-t',
+        type=int,
+        default=DEFAULT_TIMEOUT,
+        help=f'Request timeout in seconds (default: {DEFAULT_TIMEOUT})'
+    )
+    
+    parser.add_argument(
+        '--format',
+        choices=['json', 'msgpack'],
+        default='json',
+        help='Response format to request from the service (default: json)'
+    )
+    
+    subparsers = parser.add_subparsers(dest='command', help='Available commands')
+    
+    # Only the selected command's parser is built; all of them are when none
+    # is recognised, so help and invalid-choice errors still list every command
+    command = _selected_command(sys.argv[1:])
+    builders = [SUBCOMMANDS[command]] if command in SUBCOMMANDS else SUBCOMMANDS.values()
+    for build in builders:
+        build(subparsers)
     
     args = parser.parse_args()
     
     if not args.command:
-        parser.print_help()
+        # A one-line hint; formatting the full help is left to --help
+        sys.stderr.write(f"usage: {parser.prog} [options] {{{','.join(SUBCOMMANDS)}}} ...; "
+                         "run with --help for details\n")
         return 1
     
+    return _run(args)
+
+
+def _run(args):
+    """Run the parsed command against the assistant service"""
     # Create client
-    config = AssistantConfig(base_url=args.url, timeout=args.timeout)
-    client = AssistantClient(config)
+    if 'common.assistant_client' not in sys.modules:
+        sys.path.insert(0, str(SRC_DIR))
+    from common.assistant_client import AssistantClient, AssistantConfig
+
+    config = AssistantConfig(base_url=args.url, timeout=args.timeout, response_format=args.format)
     
+    # One pooled connection for the whole command, interactive chat included
     try:
-        if args.command == 'health':
-            result = client.health_check()
-            print("✅ Service Health:")
-            print(json.dumps(result, indent=2))
-            
-        elif args.command == 'status':
-            result = client.get_system_status()
-            print("📊 System Status:")
-            print(json.dumps(result, indent=2))
-            
-        elif args.command == 'models':
-            result = client.get_available_models()
-            print("🤖 Available Models:")
-            print(json.dumps(result, indent=2))
-            
-        elif args.command == 'chat':
-            print("🤖 Starting interactive chat...")
-            interactive_chat(args.url)
-            
-        elif args.command == 'ask':
-            context = {}
-            if args.context:
-                try:
-                    context = json.loads(args.context)
-                except json.JSONDecodeError:
-                    print(f"❌ Invalid JSON context: {args.context}")
-                    return 1
-            
-            print(f"👤 Question: {args.question}")
-            if context:
-                print(f"📝 Context: {json.dumps(context, indent=2)}")
-            
-            print("\n🤔 Thinking...")
-            result = client.ask_question(args.question, context=context)
-            
-            print(f"\n🤖 Assistant: {result.get('response', 'No response received')}")
-            if 'confidence' in result:
-                print(f"   Confidence: {result['confidence']:.2f}")
-            if 'model_used' in result:
-                print(f"   Model: {result['model_used']}")
-                
-        elif args.command == 'analyze':
-            print(f"📄 Analyzing text: {args.text[:100]}{'...' if len(args.text) > 100 else ''}")
-            print(f"🔍 Analysis type: {args.type}")
-            
-            result = client.analyze_document(args.text, args.type)
-            print(f"\n📊 Analysis Results:")
-            print(json.dumps(result, indent=2))
-            
-        elif args.command == 'recommend':
-            print(f"🔍 Getting recommendations for: {args.query}")
-            print(f"📊 Limit: {args.limit}")
-            
-            result = client.get_recommendations(args.query, args.limit)
-            print(f"\n💡 Recommendations:")
-            print(json.dumps(result, indent=2))
-            
-        elif args.command == 'history':
-            print(f"📚 Getting conversation history...")
-            if args.session:
-                print(f"   Session ID: {args.session}")
-            print(f"   Limit: {args.limit}")
-            
-            result = client.get_conversation_history(args.session, args.limit)
-            print(f"\n💬 Conversation History:")
-            print(json.dumps(result, indent=2))
-            
-        elif args.command == 'clear':
-            if args.session:
-                print(f"🧹 Clearing conversation history for session: {args.session}")
-            else:
-                print("🧹 Clearing all conversation history...")
-            
-            result = client.clear_conversation(args.session)
-            print(f"✅ {result.get('message', 'History cleared')}")
-            
-        else:
-            print(f"❌ Unknown command: {args.command}")
-            parser.print_help()
-            return 1
-            
-    except Exception as e:
-        print(f"❌ Error: {e}")
-        print(f"💡 Make sure the assistant service is running at {args.url}")
+        client = AssistantClient(config)
+    except ImportError as e:
+        print(f"❌ {e}")
         return 1
     
-    return 0
+    with client:
+        try:
+            return COMMANDS[args.command](args, client) or 0
+        except Exception as e:
+            print(f"❌ Error: {e}")
+            print(f"💡 Make sure the assistant service is running at {args.url}")
+            return 1
 
 if __name__ == "__main__":
     sys.exit(main())